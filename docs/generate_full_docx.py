@@ -4,10 +4,17 @@ Parses the Markdown file and converts it to a styled .docx.
 Includes PlantUML diagram rendering via the PlantUML web service.
 """
 
+import io
 import os
 import re
+import base64
+import copy
+import hashlib
+import time
 import zlib
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from docx import Document
 from docx.shared import Inches, Pt, Cm, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
@@ -16,11 +23,15 @@ from docx.oxml.ns import nsdecls
 from docx.oxml import parse_xml
 
 try:
-    from urllib.request import urlopen, Request
-    from urllib.error import URLError
-    HAS_URLLIB = True
+    import http.client
+    HAS_HTTP = True
 except ImportError:
-    HAS_URLLIB = False
+    HAS_HTTP = False
+
+PLANTUML_HOST    = 'www.plantuml.com'
+PLANTUML_WORKERS = 8   # concurrent renders; also bounds load on the public server
+PLANTUML_CACHE   = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.puml_cache')   # shared with generate_docx.py
+PNG_SIGNATURE    = b'\x89PNG\r\n\x1a\n'
 
 # ── Color Palette ──────────────────────────────────────────────────
 PRIMARY      = RGBColor(0x1A, 0x56, 0xDB)
@@ -29,126 +40,234 @@ DARK         = RGBColor(0x1F, 0x29, 0x37)
 MEDIUM       = RGBColor(0x4B, 0x55, 0x63)
 LIGHT_TEXT   = RGBColor(0x6B, 0x72, 0x80)
 WHITE        = RGBColor(0xFF, 0xFF, 0xFF)
+INLINE_CODE  = RGBColor(0x9B, 0x17, 0x4D)   # Inline `code` spans
+
+# ── Measurements ───────────────────────────────────────────────────
+PT_3    = Pt(3)
+PT_4    = Pt(4)
+PT_6    = Pt(6)
+PT_8_5  = Pt(8.5)
+PT_9    = Pt(9)
+PT_10   = Pt(10)
+PT_11   = Pt(11)
+CM_0_5  = Cm(0.5)
+CM_1    = Cm(1.0)
+CM_1_5  = Cm(1.5)
+
+PAGE_MARGIN = Cm(2.5)
+
+# ── OOXML Fragments (pre-encoded; parse_xml takes bytes as-is) ─────
+NSDECLS_W = nsdecls('w')
+TABLE_BORDERS_XML = (
+    f'<w:tblBorders {NSDECLS_W}>'
+    '<w:top w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
+    '<w:left w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
+    '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
+    '<w:right w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
+    '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
+    '<w:insideV w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
+    '</w:tblBorders>'
+).encode()
+CODE_SHADING_XML = f'<w:shd {NSDECLS_W} w:val="clear" w:fill="F3F4F6"/>'.encode()
+INFO_SHADING_XML = f'<w:shd {NSDECLS_W} w:val="clear" w:fill="E8F4FD"/>'.encode()
+INFO_BORDER_XML = (
+    f'<w:pBdr {NSDECLS_W}><w:left w:val="single" w:sz="24" w:space="4" w:color="1A56DB"/></w:pBdr>'
+).encode()
+RULE_BORDER_XML = (
+    f'<w:pBdr {NSDECLS_W}><w:bottom w:val="single" w:sz="6" w:space="1" w:color="D1D5DB"/></w:pBdr>'
+).encode()
+# Run properties, in the element order python-docx itself writes (rFonts, b, color, sz)
+def _rpr_xml(size, bold=False, color=None, font=None):
+    fonts = f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}"/>' if font else ''
+    colour = f'<w:color w:val="{color}"/>' if color else ''
+    return f'<w:rPr>{fonts}{"<w:b/>" if bold else ""}{colour}<w:sz w:val="{int(size.pt * 2)}"/></w:rPr>'
+
+BODY_RPR_XML        = _rpr_xml(PT_11)
+BOLD_RPR_XML        = _rpr_xml(PT_11, bold=True)
+INLINE_CODE_RPR_XML = _rpr_xml(PT_10, color=INLINE_CODE, font='Consolas')
+CODE_BLOCK_RPR_XML  = _rpr_xml(PT_8_5, color=DARK, font='Consolas')
+TOC_NUMBER_RPR_XML  = _rpr_xml(PT_11, bold=True, color=PRIMARY)
+TOC_TITLE_RPR_XML   = _rpr_xml(PT_11, color=DARK)
+
+# ── Parsed Templates (deep-copied per use instead of re-parsed) ────
+TABLE_BORDERS = parse_xml(TABLE_BORDERS_XML)
+# Table cell fill -> <w:shd>; set_cell_shading adds other fills on first use
+CELL_SHADING = {
+    fill: parse_xml(f'<w:shd {NSDECLS_W} w:fill="{fill}"/>') for fill in ('1A56DB', 'F0F4FF')
+}
+
+
+# ── Raw Run XML ────────────────────────────────────────────────────
+def _escape(text):
+    """XML-escape &, < and > for a w:t body."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _text_xml(text):
+    """Run content for text, mapping newlines and tabs to <w:br/> and <w:tab/> like python-docx."""
+    parts = []
+    for i, line in enumerate(text.split('\n')):
+        if i:
+            parts.append('<w:br/>')
+        for j, segment in enumerate(line.split('\t')):
+            if j:
+                parts.append('<w:tab/>')
+            if segment:
+                space = ' xml:space="preserve"' if segment != segment.strip() else ''
+                parts.append(f'<w:t{space}>{_escape(segment)}</w:t>')
+    return ''.join(parts)
+
+def _run_xml(text, rpr):
+    return f'<w:r>{rpr}{_text_xml(text)}</w:r>'
+
+def append_runs(p, runs):
+    """Parse a batch of <w:r> strings once and append them to paragraph p."""
+    p._p.extend(parse_xml(f'<w:p {NSDECLS_W}>{"".join(runs)}</w:p>'))
+    return p
+
+
+# ── Markdown Patterns ──────────────────────────────────────────────
+INLINE_RE       = re.compile(r'\*\*(?P<bold>.*?)\*\*|`(?P<code>[^`]+)`')   # **bold** and `code` spans
+NUM_LIST_RE     = re.compile(r'^(\d+)\.\s+(.*)')
+TABLE_SEP_RE    = re.compile(r'^[-:]+$')                 # one cell of a |---|:---| row
+HEADING_RE      = re.compile(r'^(#{1,4}) (.*)')
+HEADING_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
 
 
 # ── PlantUML Rendering ────────────────────────────────────────────
-def _encode6bit(b):
-    if b < 10: return chr(48 + b)
-    b -= 10
-    if b < 26: return chr(65 + b)
-    b -= 26
-    if b < 26: return chr(97 + b)
-    b -= 26
-    if b == 0: return '-'
-    if b == 1: return '_'
-    return '?'
+# PlantUML's URL encoding is base64 over a different 64-character alphabet
+_PLANTUML_B64 = bytes.maketrans(
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/',
+    b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_',
+)
 
 def plantuml_encode(text):
     """Encode PlantUML text for the web service URL."""
     compressed = zlib.compress(text.encode('utf-8'))
     compressed = compressed[2:-4]  # Strip zlib header/checksum
-    result = ''
-    i = 0
-    while i < len(compressed):
-        if i + 2 < len(compressed):
-            b1, b2, b3 = compressed[i], compressed[i+1], compressed[i+2]
-            result += _encode6bit(b1 >> 2)
-            result += _encode6bit(((b1 & 0x3) << 4) | (b2 >> 4))
-            result += _encode6bit(((b2 & 0xF) << 2) | (b3 >> 6))
-            result += _encode6bit(b3 & 0x3F)
-        elif i + 1 < len(compressed):
-            b1, b2 = compressed[i], compressed[i+1]
-            result += _encode6bit(b1 >> 2)
-            result += _encode6bit(((b1 & 0x3) << 4) | (b2 >> 4))
-            result += _encode6bit((b2 & 0xF) << 2)
-        else:
-            b1 = compressed[i]
-            result += _encode6bit(b1 >> 2)
-            result += _encode6bit((b1 & 0x3) << 4)
-        i += 3
-    return result
-
-def render_plantuml(text, output_dir, retries=3):
-    """Render PlantUML text to a PNG image file. Returns path or None."""
-    if not HAS_URLLIB:
+    return base64.b64encode(compressed).rstrip(b'=').translate(_PLANTUML_B64).decode('ascii')
+
+_http = threading.local()   # one keep-alive connection per render thread
+
+def _plantuml_get(path):
+    """GET a PNG from the PlantUML server over this thread's persistent HTTPS connection.
+
+    HTTPS is used both because the server redirects plain HTTP to it and to keep
+    diagram source off the wire in cleartext. Raises unless the reply is a 200
+    carrying PNG data, so error pages go through the caller's retry path.
+    """
+    conn = getattr(_http, 'conn', None)
+    if conn is None:
+        conn = _http.conn = http.client.HTTPSConnection(PLANTUML_HOST, timeout=30)
+    try:
+        conn.request('GET', path, headers={'User-Agent': 'ChronosDB-DocGen/1.0'})
+        resp = conn.getresponse()
+        body = resp.read()   # read fully so the connection can be reused
+    except Exception:
+        conn.close()        # drop a broken connection; the next attempt reconnects
+        _http.conn = None
+        raise
+    if resp.status != 200:
+        raise IOError(f'PlantUML server returned HTTP {resp.status} {resp.reason}')
+    if not body.startswith(PNG_SIGNATURE):
+        raise IOError('PlantUML server did not return a PNG')
+    return body
+
+def render_plantuml(text, retries=3):
+    """Render PlantUML text to PNG bytes. Returns bytes or None.
+
+    Images are cached in PLANTUML_CACHE under a hash of the source, so an
+    unchanged diagram is never fetched twice. Only verified PNGs are cached;
+    an entry that is not one is rendered again and overwritten.
+    """
+    key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    cached = os.path.join(PLANTUML_CACHE, key + '.png')
+    if os.path.exists(cached):
+        with open(cached, 'rb') as f:
+            img_data = f.read()
+        if img_data.startswith(PNG_SIGNATURE):
+            return img_data
+    if not HAS_HTTP:
         return None
-    import time
+    encoded = plantuml_encode(text)
     for attempt in range(retries):
         try:
             if attempt > 0:
                 time.sleep(2 * attempt)
-            encoded = plantuml_encode(text)
-            url = f'http://www.plantuml.com/plantuml/png/{encoded}'
-            req = Request(url, headers={'User-Agent': 'ChronosDB-DocGen/1.0'})
-            response = urlopen(req, timeout=30)
-            img_data = response.read()
+            img_data = _plantuml_get(f'/plantuml/png/{encoded}')
             if len(img_data) < 100:
                 continue
-            fd, path = tempfile.mkstemp(suffix='.png', dir=output_dir)
+            os.makedirs(PLANTUML_CACHE, exist_ok=True)
+            fd, path = tempfile.mkstemp(suffix='.png', dir=PLANTUML_CACHE)
             with os.fdopen(fd, 'wb') as f:
                 f.write(img_data)
-            return path
+            os.replace(path, cached)   # atomic, so a concurrent build never reads half a file
+            return img_data
         except Exception as e:
             print(f'  [WARN] PlantUML render attempt {attempt + 1} failed: {e}')
             if attempt == retries - 1:
                 return None
     return None
 
-def add_plantuml_diagram(doc, plantuml_text, output_dir):
-    """Render and add a PlantUML diagram as an image to the document."""
-    img_path = render_plantuml(plantuml_text, output_dir)
-    if img_path:
+def render_plantuml_blocks(blocks):
+    """Render PlantUML sources concurrently. Returns PNG bytes (or None) in input order.
+
+    Renders are network-bound, so PLANTUML_WORKERS threads overlap their round
+    trips; each thread reuses its own keep-alive connection.
+    """
+    if not blocks:
+        return []
+    with ThreadPoolExecutor(max_workers=min(PLANTUML_WORKERS, len(blocks))) as pool:
+        return list(pool.map(render_plantuml, blocks))
+
+def add_plantuml_diagram(doc, plantuml_text, img_data):
+    """Add a rendered PlantUML diagram image, or its source if rendering failed."""
+    if img_data:
         try:
             p = doc.add_paragraph()
             p.alignment = WD_ALIGN_PARAGRAPH.CENTER
             run = p.add_run()
-            run.add_picture(img_path, width=Inches(6.0))
+            with io.BytesIO(img_data) as stream:
+                run.add_picture(stream, width=Inches(6.0))
             print(f'  [OK] Embedded PlantUML diagram as image')
-            try:
-                os.remove(img_path)
-            except:
-                pass
             return True
         except Exception as e:
             print(f'  [WARN] Failed to embed image: {e}')
-            try:
-                os.remove(img_path)
-            except:
-                pass
     # Fallback: add as styled code block with diagram label
     label = doc.add_paragraph()
     label.alignment = WD_ALIGN_PARAGRAPH.CENTER
     run = label.add_run('\u25bc UML Diagram (PlantUML Source) \u25bc')
-    run.font.size = Pt(10)
+    run.font.size = PT_10
     run.font.bold = True
     run.font.color.rgb = PRIMARY
     add_code_block(doc, plantuml_text)
     note = doc.add_paragraph()
     note.alignment = WD_ALIGN_PARAGRAPH.CENTER
     run = note.add_run('Render at: plantuml.com/plantuml')
-    run.font.size = Pt(9)
+    run.font.size = PT_9
     run.font.italic = True
     run.font.color.rgb = LIGHT_TEXT
     return False
 
 
 def set_cell_shading(cell, color_hex):
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color_hex}"/>')
-    cell._tc.get_or_add_tcPr().append(shading)
+    shading = CELL_SHADING.get(color_hex)
+    if shading is None:
+        shading = CELL_SHADING[color_hex] = parse_xml(f'<w:shd {NSDECLS_W} w:fill="{color_hex}"/>')
+    cell._tc.get_or_add_tcPr().append(copy.deepcopy(shading))
 
 
 def style_document(doc):
     for section in doc.sections:
-        section.top_margin = Cm(2.5)
-        section.bottom_margin = Cm(2.5)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
+        section.top_margin = PAGE_MARGIN
+        section.bottom_margin = PAGE_MARGIN
+        section.left_margin = PAGE_MARGIN
+        section.right_margin = PAGE_MARGIN
 
     style = doc.styles['Normal']
     style.font.name = 'Calibri'
-    style.font.size = Pt(11)
+    style.font.size = PT_11
     style.font.color.rgb = DARK
-    style.paragraph_format.space_after = Pt(6)
+    style.paragraph_format.space_after = PT_6
     style.paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
     style.paragraph_format.line_spacing = 1.15
 
@@ -169,169 +288,154 @@ def style_document(doc):
 
 
 def add_styled_table(doc, headers, rows):
-    table = doc.add_table(rows=1 + len(rows), cols=len(headers))
+    cols = len(headers)
+    table = doc.add_table(rows=1 + len(rows), cols=cols)
     table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = True
+    cells = table._cells   # row-major, built in one walk of the grid
 
     for i, header in enumerate(headers):
-        cell = table.rows[0].cells[i]
-        cell.text = ''
+        cell = cells[i]
         p = cell.paragraphs[0]
         run = p.add_run(header)
         run.bold = True
         run.font.color.rgb = WHITE
-        run.font.size = Pt(10)
-        run.font.name = 'Calibri'
+        run.font.size = PT_10
         set_cell_shading(cell, '1A56DB')
 
     for r_idx, row in enumerate(rows):
-        for c_idx, value in enumerate(row):
-            if c_idx >= len(table.columns):
-                continue
-            cell = table.rows[r_idx + 1].cells[c_idx]
-            cell.text = ''
+        for c_idx, value in enumerate(row[:cols]):
+            cell = cells[(r_idx + 1) * cols + c_idx]
             p = cell.paragraphs[0]
             run = p.add_run(str(value))
-            run.font.size = Pt(10)
-            run.font.name = 'Calibri'
+            run.font.size = PT_10
             run.font.color.rgb = DARK
             if r_idx % 2 == 1:
                 set_cell_shading(cell, 'F0F4FF')
 
     tbl = table._tbl
-    tblPr = tbl.tblPr if tbl.tblPr is not None else parse_xml(f'<w:tblPr {nsdecls("w")}/>')
-    borders = parse_xml(
-        f'<w:tblBorders {nsdecls("w")}>'
-        f'  <w:top w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
-        f'  <w:left w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
-        f'  <w:bottom w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
-        f'  <w:right w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
-        f'  <w:insideH w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
-        f'  <w:insideV w:val="single" w:sz="4" w:space="0" w:color="D1D5DB"/>'
-        f'</w:tblBorders>'
-    )
-    tblPr.append(borders)
+    tblPr = tbl.tblPr if tbl.tblPr is not None else parse_xml(f'<w:tblPr {NSDECLS_W}/>')
+    tblPr.append(copy.deepcopy(TABLE_BORDERS))
     doc.add_paragraph()
     return table
 
 
+def add_blank_paragraphs(doc, count):
+    """Add count empty spacer paragraphs with a single parse."""
+    sectPr = doc.element.body.sectPr
+    for p in list(parse_xml(f'<w:body {NSDECLS_W}>{"<w:p/>" * count}</w:body>')):
+        sectPr.addprevious(p)
+
+
 def add_code_block(doc, code):
     p = doc.add_paragraph()
-    p.paragraph_format.space_before = Pt(4)
-    p.paragraph_format.space_after = Pt(4)
-    p.paragraph_format.left_indent = Cm(0.5)
+    p.paragraph_format.space_before = PT_4
+    p.paragraph_format.space_after = PT_4
+    p.paragraph_format.left_indent = CM_0_5
     p.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
-    run = p.add_run(code)
-    run.font.name = 'Consolas'
-    run.font.size = Pt(8.5)
-    run.font.color.rgb = DARK
+    append_runs(p, [_run_xml(code, CODE_BLOCK_RPR_XML)])
     pPr = p._p.get_or_add_pPr()
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:val="clear" w:fill="F3F4F6"/>')
+    shading = parse_xml(CODE_SHADING_XML)
     pPr.append(shading)
 
 
 def add_info_box(doc, text):
     p = doc.add_paragraph()
-    p.paragraph_format.left_indent = Cm(0.5)
-    p.paragraph_format.space_before = Pt(6)
-    p.paragraph_format.space_after = Pt(6)
+    p.paragraph_format.left_indent = CM_0_5
+    p.paragraph_format.space_before = PT_6
+    p.paragraph_format.space_after = PT_6
     run = p.add_run(text)
-    run.font.size = Pt(10)
-    run.font.name = 'Calibri'
+    run.font.size = PT_10
     run.font.color.rgb = DARK
     run.italic = True
     pPr = p._p.get_or_add_pPr()
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:val="clear" w:fill="E8F4FD"/>')
+    shading = parse_xml(INFO_SHADING_XML)
     pPr.append(shading)
-    pBdr = parse_xml(
-        f'<w:pBdr {nsdecls("w")}>'
-        f'  <w:left w:val="single" w:sz="24" w:space="4" w:color="1A56DB"/>'
-        f'</w:pBdr>'
-    )
+    pBdr = parse_xml(INFO_BORDER_XML)
     pPr.append(pBdr)
 
 
+def _apply_inline_runs(p, text):
+    """Append text to p as runs, handling **bold** and `code` inline formatting.
+
+    One finditer pass yields each span with its kind (the named group that
+    matched); the plain text between spans becomes ordinary runs.
+    """
+    runs = []
+    pos = 0
+    for m in INLINE_RE.finditer(text):
+        if m.start() > pos:
+            runs.append(_run_xml(text[pos:m.start()], BODY_RPR_XML))
+        if m.lastgroup == 'bold':
+            runs.append(_run_xml(m.group('bold'), BOLD_RPR_XML))
+        else:
+            runs.append(_run_xml(m.group('code'), INLINE_CODE_RPR_XML))
+        pos = m.end()
+    if pos < len(text):
+        runs.append(_run_xml(text[pos:], BODY_RPR_XML))
+    return append_runs(p, runs)
+
+
 def add_paragraph_with_formatting(doc, text):
     """Add a paragraph, handling **bold** and `code` inline formatting."""
-    p = doc.add_paragraph()
-    # Split by **bold** and `code` patterns
-    parts = re.split(r'(\*\*.*?\*\*|`[^`]+`)', text)
-    for part in parts:
-        if part.startswith('**') and part.endswith('**'):
-            run = p.add_run(part[2:-2])
-            run.bold = True
-            run.font.size = Pt(11)
-            run.font.name = 'Calibri'
-        elif part.startswith('`') and part.endswith('`'):
-            run = p.add_run(part[1:-1])
-            run.font.name = 'Consolas'
-            run.font.size = Pt(10)
-            run.font.color.rgb = RGBColor(0x9B, 0x17, 0x4D)
-        else:
-            run = p.add_run(part)
-            run.font.size = Pt(11)
-            run.font.name = 'Calibri'
-    return p
+    return _apply_inline_runs(doc.add_paragraph(), text)
 
 
 def add_bullet_with_formatting(doc, text, level=0):
     """Add a bullet point, handling **bold** and `code` inline formatting."""
     p = doc.add_paragraph(style='List Bullet')
-    p.paragraph_format.left_indent = Cm(1.5 + level * 1.0)
-    p.paragraph_format.space_after = Pt(3)
+    p.paragraph_format.left_indent = Cm(1.5 + level * 1.0) if level else CM_1_5
+    p.paragraph_format.space_after = PT_3
     # Clear default runs
     for r in p.runs:
         r.text = ''
+    return _apply_inline_runs(p, text)
 
-    parts = re.split(r'(\*\*.*?\*\*|`[^`]+`)', text)
-    for part in parts:
-        if part.startswith('**') and part.endswith('**'):
-            run = p.add_run(part[2:-2])
-            run.bold = True
-            run.font.size = Pt(11)
-            run.font.name = 'Calibri'
-        elif part.startswith('`') and part.endswith('`'):
-            run = p.add_run(part[1:-1])
-            run.font.name = 'Consolas'
-            run.font.size = Pt(10)
-            run.font.color.rgb = RGBColor(0x9B, 0x17, 0x4D)
-        else:
-            run = p.add_run(part)
-            run.font.size = Pt(11)
-            run.font.name = 'Calibri'
-    return p
 
+def _plantuml_sources(lines):
+    """PlantUML fenced-block sources in document order, split the way the parser splits them."""
+    sources = []
+    in_code_block = is_plantuml = False
+    code_buffer = []
+    for line in lines:
+        if line.startswith('```'):
+            if in_code_block and is_plantuml:
+                sources.append('\n'.join(code_buffer))
+            in_code_block = not in_code_block
+            is_plantuml = in_code_block and line.strip().lower().startswith('```plantuml')
+            code_buffer = []
+        elif in_code_block:
+            code_buffer.append(line)
+    return sources
 
 def parse_markdown_to_docx(md_path, doc):
     """Parse Markdown file and add content to docx."""
     with open(md_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+        lines = f.read().splitlines()
+
+    sources = _plantuml_sources(lines)
+    print(f'  Rendering {len(sources)} PlantUML diagrams...')
+    # Consumed from the end so each PNG is released as soon as it is embedded
+    rendered = render_plantuml_blocks(sources)[::-1]
+
+    # Style objects resolved once; add_heading() would look each one up by name
+    heading_styles = {level: doc.styles[f'Heading {level}'] for level in (1, 2, 3)}
 
-    output_dir = os.path.dirname(os.path.abspath(md_path))
-    i = 0
     in_code_block = False
     is_plantuml = False
     code_buffer = []
     in_table = False
     table_headers = []
     table_rows = []
-    diagram_count = 0
-
-    while i < len(lines):
-        line = lines[i].rstrip('\n')
 
+    for line in lines:
         # Code blocks
         if line.startswith('```'):
             if in_code_block:
                 if is_plantuml:
-                    diagram_count += 1
-                    if diagram_count > 1:
-                        import time; time.sleep(1)  # Avoid rate limiting
-                    print(f'  Rendering PlantUML diagram {diagram_count}...')
-                    add_plantuml_diagram(doc, '\n'.join(code_buffer), output_dir)
+                    add_plantuml_diagram(doc, '\n'.join(code_buffer), rendered.pop())
                 else:
                     add_code_block(doc, '\n'.join(code_buffer))
-                code_buffer = []
+                code_buffer.clear()
                 in_code_block = False
                 is_plantuml = False
             else:
@@ -343,27 +447,23 @@ def parse_markdown_to_docx(md_path, doc):
                     table_rows = []
                 in_code_block = True
                 is_plantuml = line.strip().lower().startswith('```plantuml')
-            i += 1
             continue
 
         if in_code_block:
             code_buffer.append(line)
-            i += 1
             continue
 
         # Table rows
         if '|' in line and line.strip().startswith('|'):
             cells = [c.strip() for c in line.strip().strip('|').split('|')]
             # Check if separator row (---|---)
-            if all(re.match(r'^[-:]+$', c) for c in cells):
-                i += 1
+            if all(TABLE_SEP_RE.match(c) for c in cells):
                 continue
             if not in_table:
                 in_table = True
                 table_headers = cells
             else:
                 table_rows.append(cells)
-            i += 1
             continue
         else:
             if in_table:
@@ -372,75 +472,45 @@ def parse_markdown_to_docx(md_path, doc):
                 table_headers = []
                 table_rows = []
 
-        # Headings
-        if line.startswith('# ') and not line.startswith('##'):
-            # Skip the main title — we have a cover page
-            i += 1
-            continue
-        elif line.startswith('## '):
-            heading_text = line[3:].strip()
-            # Remove markdown link syntax from heading
-            heading_text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', heading_text)
-            doc.add_heading(heading_text, level=1)
-            i += 1
-            continue
-        elif line.startswith('### '):
-            heading_text = line[4:].strip()
-            doc.add_heading(heading_text, level=2)
-            i += 1
-            continue
-        elif line.startswith('#### '):
-            heading_text = line[5:].strip()
-            doc.add_heading(heading_text, level=3)
-            i += 1
+        # Headings: '#' is the main title (skipped — we have a cover page), '##'..'####' map to levels 1..3
+        m = HEADING_RE.match(line)
+        if m:
+            level = len(m.group(1)) - 1
+            if level:
+                heading_text = m.group(2).strip()
+                if level == 1:
+                    # Remove markdown link syntax from heading
+                    heading_text = HEADING_LINK_RE.sub(r'\1', heading_text)
+                doc.add_paragraph(heading_text, heading_styles[level])
             continue
 
         # Horizontal rule
         if line.strip() == '---':
-            i += 1
             continue
 
         # Bullet points
         if line.startswith('- '):
             add_bullet_with_formatting(doc, line[2:])
-            i += 1
             continue
 
         # Numbered lists
-        m = re.match(r'^(\d+)\.\s+(.*)', line)
+        m = NUM_LIST_RE.match(line)
         if m:
             num = m.group(1)
             text = m.group(2)
             p = doc.add_paragraph()
-            p.paragraph_format.left_indent = Cm(1.0)
-            p.paragraph_format.space_after = Pt(3)
+            p.paragraph_format.left_indent = CM_1
+            p.paragraph_format.space_after = PT_3
             run = p.add_run(f'{num}. ')
             run.bold = True
             run.font.color.rgb = PRIMARY
-            run.font.size = Pt(11)
+            run.font.size = PT_11
             # Handle formatting in rest
-            parts = re.split(r'(\*\*.*?\*\*|`[^`]+`)', text)
-            for part in parts:
-                if part.startswith('**') and part.endswith('**'):
-                    run = p.add_run(part[2:-2])
-                    run.bold = True
-                    run.font.size = Pt(11)
-                    run.font.name = 'Calibri'
-                elif part.startswith('`') and part.endswith('`'):
-                    run = p.add_run(part[1:-1])
-                    run.font.name = 'Consolas'
-                    run.font.size = Pt(10)
-                    run.font.color.rgb = RGBColor(0x9B, 0x17, 0x4D)
-                else:
-                    run = p.add_run(part)
-                    run.font.size = Pt(11)
-                    run.font.name = 'Calibri'
-            i += 1
+            _apply_inline_runs(p, text)
             continue
 
         # Empty lines
         if line.strip() == '':
-            i += 1
             continue
 
         # Italic info text (starts with *)
@@ -450,27 +520,50 @@ def parse_markdown_to_docx(md_path, doc):
             p.alignment = WD_ALIGN_PARAGRAPH.CENTER
             run = p.add_run(text)
             run.italic = True
-            run.font.size = Pt(10)
+            run.font.size = PT_10
             run.font.color.rgb = LIGHT_TEXT
-            i += 1
             continue
 
         # Regular paragraph
         add_paragraph_with_formatting(doc, line)
-        i += 1
 
     # Flush remaining table
     if in_table:
         add_styled_table(doc, table_headers, table_rows)
 
 
+# Chapter list for the table of contents; number prefixes carry their own spacing
+TOC_ITEMS = (
+    ('1.  ', 'Project Overview'),
+    ('2.  ', 'System Architecture'),
+    ('3.  ', 'Storage Layer'),
+    ('4.  ', 'Buffer Pool Management'),
+    ('5.  ', 'Catalog & Metadata'),
+    ('6.  ', 'Parser & Lexer'),
+    ('7.  ', 'Execution Engine'),
+    ('8.  ', 'Concurrency Control'),
+    ('9.  ', 'Recovery & Write-Ahead Logging'),
+    ('10.  ', 'Time Travel Engine'),
+    ('11.  ', 'Network Layer'),
+    ('12.  ', 'Authentication & RBAC'),
+    ('13.  ', 'AI Layer \u2014 Self-Learning Execution Engine'),
+    ('14.  ', 'AI Layer \u2014 Immune System'),
+    ('15.  ', 'AI Layer \u2014 Temporal Index Manager'),
+    ('16.  ', 'AI Shared Foundation'),
+    ('17.  ', 'Command-Line Interfaces'),
+    ('18.  ', 'SQL Commands Reference'),
+    ('19.  ', 'UML Diagrams'),
+    ('20.  ', 'File Inventory'),
+    ('21.  ', 'Algorithm Reference'),
+)
+
+
 def build_document(md_path):
     doc = Document()
     style_document(doc)
 
     # ═══ COVER PAGE ═══
-    for _ in range(6):
-        doc.add_paragraph()
+    add_blank_paragraphs(doc, 6)
 
     title = doc.add_paragraph()
     title.alignment = WD_ALIGN_PARAGRAPH.CENTER
@@ -478,14 +571,12 @@ def build_document(md_path):
     run.font.size = Pt(42)
     run.font.bold = True
     run.font.color.rgb = PRIMARY
-    run.font.name = 'Calibri'
 
     subtitle = doc.add_paragraph()
     subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
     run = subtitle.add_run('Complete System Technical Documentation')
     run.font.size = Pt(20)
     run.font.color.rgb = MEDIUM
-    run.font.name = 'Calibri'
 
     doc.add_paragraph()
 
@@ -505,63 +596,30 @@ def build_document(md_path):
     )
     run.font.size = Pt(12)
     run.font.color.rgb = LIGHT_TEXT
-    run.font.name = 'Calibri'
 
-    for _ in range(4):
-        doc.add_paragraph()
+    add_blank_paragraphs(doc, 4)
 
     meta = doc.add_paragraph()
     meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
     run = meta.add_run('Version 1.0  \u2022  February 2026')
-    run.font.size = Pt(11)
+    run.font.size = PT_11
     run.font.color.rgb = LIGHT_TEXT
 
     meta2 = doc.add_paragraph()
     meta2.alignment = WD_ALIGN_PARAGRAPH.CENTER
     run = meta2.add_run('C++20  \u2022  CMake + Ninja  \u2022  Windows / Linux')
-    run.font.size = Pt(11)
+    run.font.size = PT_11
     run.font.color.rgb = LIGHT_TEXT
 
     doc.add_page_break()
 
     # ═══ TABLE OF CONTENTS ═══
     doc.add_heading('Table of Contents', level=1)
-    toc_items = [
-        ('1.', 'Project Overview'),
-        ('2.', 'System Architecture'),
-        ('3.', 'Storage Layer'),
-        ('4.', 'Buffer Pool Management'),
-        ('5.', 'Catalog & Metadata'),
-        ('6.', 'Parser & Lexer'),
-        ('7.', 'Execution Engine'),
-        ('8.', 'Concurrency Control'),
-        ('9.', 'Recovery & Write-Ahead Logging'),
-        ('10.', 'Time Travel Engine'),
-        ('11.', 'Network Layer'),
-        ('12.', 'Authentication & RBAC'),
-        ('13.', 'AI Layer \u2014 Self-Learning Execution Engine'),
-        ('14.', 'AI Layer \u2014 Immune System'),
-        ('15.', 'AI Layer \u2014 Temporal Index Manager'),
-        ('16.', 'AI Shared Foundation'),
-        ('17.', 'Command-Line Interfaces'),
-        ('18.', 'SQL Commands Reference'),
-        ('19.', 'UML Diagrams'),
-        ('20.', 'File Inventory'),
-        ('21.', 'Algorithm Reference'),
-    ]
-    for num, title_text in toc_items:
+    for prefix, title_text in TOC_ITEMS:
         p = doc.add_paragraph()
-        p.paragraph_format.space_after = Pt(3)
-        p.paragraph_format.left_indent = Cm(1.0)
-        run = p.add_run(f'{num}  ')
-        run.bold = True
-        run.font.size = Pt(11)
-        run.font.color.rgb = PRIMARY
-        run.font.name = 'Calibri'
-        run = p.add_run(title_text)
-        run.font.size = Pt(11)
-        run.font.color.rgb = DARK
-        run.font.name = 'Calibri'
+        p.paragraph_format.space_after = PT_3
+        p.paragraph_format.left_indent = CM_1
+        append_runs(p, [_run_xml(prefix, TOC_NUMBER_RPR_XML), _run_xml(title_text, TOC_TITLE_RPR_XML)])
 
     doc.add_page_break()
 
@@ -572,11 +630,7 @@ def build_document(md_path):
     doc.add_page_break()
     p = doc.add_paragraph()
     pPr = p._p.get_or_add_pPr()
-    pBdr = parse_xml(
-        f'<w:pBdr {nsdecls("w")}>'
-        f'  <w:bottom w:val="single" w:sz="6" w:space="1" w:color="D1D5DB"/>'
-        f'</w:pBdr>'
-    )
+    pBdr = parse_xml(RULE_BORDER_XML)
     pPr.append(pBdr)
 
     for text in [
@@ -588,7 +642,7 @@ def build_document(md_path):
         fp = doc.add_paragraph()
         fp.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run = fp.add_run(text)
-        run.font.size = Pt(10)
+        run.font.size = PT_10
         run.font.color.rgb = LIGHT_TEXT
         run.italic = True
 
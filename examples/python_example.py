@@ -3,6 +3,18 @@ import sys
 import json
 import binascii
 
+# orjson when installed (much faster on large result sets); stdlib json otherwise
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(obj): return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj): return json.dumps(obj, indent=2, ensure_ascii=False)
+
+# Hex dump: printable ASCII as-is, everything else as '.'
+_PRINTABLE_TABLE = bytes(c if 32 <= c < 127 else 46 for c in range(256))
+
 # --- UI Helpers ---
 class UI:
     HEADER = '\033[95m'
@@ -27,13 +39,13 @@ class UI:
         try:
             # If the driver returned a list directly (Binary/Object mode), dump it
             if isinstance(data_str, list):
-                print(f"{UI.BLUE}{json.dumps(data_str, indent=4)}{UI.ENDC}")
+                print(f"{UI.BLUE}{_dumps(data_str)}{UI.ENDC}")
                 print(f"{UI.WARNING}Records: {len(data_str)}{UI.ENDC}")
                 return
 
             # If it's a JSON string
-            parsed = json.loads(data_str)
-            pretty_output = json.dumps(parsed, indent=4)
+            parsed = _loads(data_str)
+            pretty_output = _dumps(parsed)
             print(f"{UI.BLUE}{pretty_output}{UI.ENDC}")
             if isinstance(parsed, list):
                 print(f"{UI.WARNING}Records: {len(parsed)}{UI.ENDC}")
@@ -68,8 +80,8 @@ class UI:
             chunk_size = 16
             for i in range(0, len(data_bytes), chunk_size):
                 chunk = data_bytes[i:i+chunk_size]
-                hex_part = ' '.join(f'{b:02x}' for b in chunk)
-                text_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+                hex_part = binascii.hexlify(chunk, b' ').decode('ascii')
+                text_part = chunk.translate(_PRINTABLE_TABLE).decode('ascii')
                 print(f"{i:04x}  {hex_part:<48}  |{text_part}|")
 
             print(f"{UI.BLUE}--- END DUMP ({len(data_bytes)} bytes) ---{UI.ENDC}")
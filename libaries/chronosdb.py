@@ -1,6 +1,12 @@
+import asyncio
+import queue
+import select
 import socket
 import struct
-from typing import Optional, Tuple, Any, List, Dict, Union
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Optional, Tuple, Any, List, Dict, Iterator, Union
 
 # ==========================================
 # 1. CUSTOM EXCEPTIONS
@@ -16,143 +22,375 @@ class QueryError(ChronosDBError): pass
 CMD_TEXT   = b'Q'
 CMD_JSON   = b'J'
 CMD_BINARY = b'B'
+# unknown modes fall back to text; 'columnar' is the binary protocol returned as one sequence per column
+MODE_COMMANDS = {'text': CMD_TEXT, 'json': CMD_JSON, 'binary': CMD_BINARY, 'columnar': CMD_BINARY}
 HEADER_STRUCT = struct.Struct('!cI')
+U32           = struct.Struct('!I')   # every length / count field in a response
+U32_PAIR      = struct.Struct('!II')  # table header: num_cols, num_rows
+RECV_BUFFER   = 65536   # bytes buffered per socket read
+PIPELINE_SIZE = 32768   # request bytes in flight per executemany() write; fits in the kernel socket buffers
+
+# Column type tags in a Table (0x02) response. The server currently writes
+# COL_STRING for every column, including numeric ones.
+COL_STRING = 2
+
+# First bytes float() can accept (digits, sign, point, whitespace, inf/nan)
+_NUMERIC_LEAD = frozenset(b'0123456789+-. \t\n\r\x0b\x0ciInN')
+
+def _auto_value(raw: bytes) -> Union[int, float, str]:
+    """Converts a STRING cell: integers and floats come back as numbers, anything else as str."""
+    # bytes.isdigit() is ASCII-only, and int()/float() parse bytes directly
+    if raw.isdigit() or (raw[:1] == b'-' and raw[1:].isdigit()):
+        return int(raw)
+    if not raw or raw[0] not in _NUMERIC_LEAD:
+        return raw.decode('utf-8')      # plain text: skip the failing float() parse
+    try:
+        return float(raw)
+    except ValueError:
+        return raw.decode('utf-8')
+
+def _build_frame(fql: str, msg_type: bytes) -> bytes:
+    """Request frame: header + UTF-8 payload."""
+    payload_bytes = fql.encode('utf-8')
+    return HEADER_STRUCT.pack(msg_type, len(payload_bytes)) + payload_bytes
+
+# Column type tag -> cell converter; unknown tags get the STRING behaviour
+COLUMN_CONVERTERS = {COL_STRING: _auto_value}
+
+def _pack_column(values: list) -> Union[array, list]:
+    """Stores an all-int or all-float column unboxed in an array ('q' / 'd'); mixed columns stay a list."""
+    if values and all(type(v) is int for v in values):
+        try:
+            return array('q', values)
+        except OverflowError:
+            return values
+    if values and all(type(v) is float for v in values):
+        return array('d', values)
+    return values
+
+def _check_unique_columns(columns: List[str]):
+    """Column-major results are keyed by name, so a repeated name (SELECT id, id ...) would drop data."""
+    seen = set()
+    for name in columns:
+        if name in seen:
+            raise QueryError(f"Duplicate column name '{name}' in columnar result; alias the columns "
+                             f"or use mode='binary'")
+        seen.add(name)
+
+# --- Binary response decoders: (data, ptr after the type byte, columnar) ---
+# Length fields are read in place with unpack_from (no 4-byte slice per field)
+def _parse_error(data: bytes, ptr: int, columnar: bool = False):
+    """ERROR (0xFF): always raises."""
+    msg_len, = U32.unpack_from(data, ptr)
+    ptr += 4
+    error_msg = data[ptr:ptr+msg_len].decode('utf-8')
+    raise QueryError(f"Server Error: {error_msg}")
+
+def _parse_message(data: bytes, ptr: int, columnar: bool = False) -> str:
+    """SIMPLE MESSAGE (0x01)."""
+    msg_len, = U32.unpack_from(data, ptr)
+    ptr += 4
+    return data[ptr:ptr+msg_len].decode('utf-8')
+
+def _parse_table(data: bytes, ptr: int, columnar: bool = False) -> Union[List[List], Dict[str, Any]]:
+    """TABLE DATA (0x02): a list of rows, or {column name: values} when columnar."""
+    u32 = U32.unpack_from
+
+    # A. Read Metadata
+    num_cols, = u32(data, ptr)
+    ptr += 4
+    num_rows, = u32(data, ptr)
+    ptr += 4
+
+    # B. Read Columns (the type tag picks each column's converter once)
+    columns = []
+    converters = []
+    for _ in range(num_cols):
+        converters.append(COLUMN_CONVERTERS.get(data[ptr], _auto_value))
+        ptr += 1
+        name_len, = u32(data, ptr)
+        ptr += 4
+        col_name = data[ptr:ptr+name_len].decode('utf-8')
+        ptr += name_len
+        columns.append(col_name)
+
+    # C. Read Rows
+    if columnar:
+        _check_unique_columns(columns)
+        values = [[] for _ in converters]
+        cells = [(column.append, convert) for column, convert in zip(values, converters)]
+        for _ in range(num_rows):
+            for append, convert in cells:
+                val_len, = u32(data, ptr)
+                ptr += 4
+                append(convert(data[ptr:ptr+val_len]))
+                ptr += val_len
+
+        return dict(zip(columns, map(_pack_column, values)))
+
+    result_rows = []
+    for _ in range(num_rows):
+        row_data = []
+        for convert in converters:
+            val_len, = u32(data, ptr)
+            ptr += 4
+            row_data.append(convert(data[ptr:ptr+val_len]))
+            ptr += val_len
+
+        result_rows.append(row_data)
+
+    return result_rows
+
+# Response type byte -> decoder; unknown types decode to None
+_BINARY_DECODERS = {0xFF: _parse_error, 0x01: _parse_message, 0x02: _parse_table}
 
 # ==========================================
 # 3. CURSOR CLASS
 # ==========================================
 class Cursor:
-    def __init__(self, connection):
+    def __init__(self, connection, debug=False):
         self._conn = connection
         self._last_result = None
-        self.last_raw_bytes = b'' 
+        self.debug = debug   # capture raw response bytes in last_raw_bytes (off: no extra copy per read)
+        self.last_raw_bytes = b''
+        self._raw_parts = []   # debug capture of the call in progress
 
     def _recv_n(self, n):
-        """Helper: Strictly reads n bytes."""
-        data = b''
-        while len(data) < n:
-            packet = self._conn.sock.recv(n - len(data))
-            if not packet:
-                raise OperationalError("Connection closed by server")
-            data += packet
-        self.last_raw_bytes += data
+        """Helper: Strictly reads n bytes (the buffered reader loops over recv)."""
+        data = self._conn.rfile.read(n)
+        if len(data) < n:
+            self._conn._abort()
+            raise OperationalError("Connection closed by server")
+        if self.debug:
+            self._raw_parts.append(data)
         return data
 
+    def _publish_raw(self):
+        """Joins the reads captured by the current call into last_raw_bytes, once."""
+        if self._raw_parts:
+            self.last_raw_bytes = b''.join(self._raw_parts)
+            self._raw_parts = []
+
     def execute(self, fql: str, mode: str = 'text') -> Union[str, List, Dict]:
         if not self._conn.is_connected():
             raise OperationalError("Database is not connected")
 
         self.last_raw_bytes = b''
+        self._raw_parts = []
 
         # 1. Select Protocol
-        msg_type = CMD_TEXT
-        if mode == 'json': msg_type = CMD_JSON
-        elif mode == 'binary': msg_type = CMD_BINARY
+        msg_type = MODE_COMMANDS.get(mode, CMD_TEXT)
+
+        # 2. Pack & Send Request (one frame, one sendall)
+        packet = _build_frame(fql, msg_type)
+
+        try:
+            self._conn.sock.sendall(packet)
+            body_data = self._recv_response()
+        except socket.error as e:
+            self._conn._abort()   # a timed-out or failed read leaves the stream mid-frame
+            raise OperationalError(f"Network error: {e}")
+        finally:
+            self._publish_raw()
+
+        return self._parse_body(body_data, mode)
+
+    def executemany(self, fqls: List[str], mode: str = 'text') -> List[Union[str, List, Dict]]:
+        """Pipeline several statements: request frames go out in batched writes
+        and the responses are read back in order, one round-trip per batch
+        instead of one per statement.
+
+        The server handles each connection's frames strictly in sequence. A
+        batch is flushed before it would grow past PIPELINE_SIZE bytes, so the
+        requests fit in the socket buffers while neither side is reading; a
+        single frame larger than that goes out on its own, with no replies
+        outstanding. All responses are drained before any is parsed, so a
+        failing statement raises without leaving unread replies on the socket.
+        """
+        if not self._conn.is_connected():
+            raise OperationalError("Database is not connected")
+
+        self.last_raw_bytes = b''
+        self._raw_parts = []
+        msg_type = MODE_COMMANDS.get(mode, CMD_TEXT)
+        bodies = []
+
+        try:
+            frames, pending = bytearray(), 0
+            for fql in fqls:
+                frame = _build_frame(fql, msg_type)
+                if pending and len(frames) + len(frame) > PIPELINE_SIZE:
+                    self._conn.sock.sendall(frames)
+                    bodies.extend(self._recv_response() for _ in range(pending))
+                    frames, pending = bytearray(), 0
+                frames += frame
+                pending += 1
+            if pending:
+                self._conn.sock.sendall(frames)
+                bodies.extend(self._recv_response() for _ in range(pending))
+        except socket.error as e:
+            self._conn._abort()
+            raise OperationalError(f"Network error: {e}")
+        finally:
+            self._publish_raw()
+
+        return [self._parse_body(body_data, mode) for body_data in bodies]
+
+    def execute_stream(self, fql: str, mode: str = 'binary') -> Iterator[Union[str, List]]:
+        """Like execute(), but yields table rows as they are decoded off the
+        socket instead of buffering the whole response first, so peak memory is
+        one row rather than the full body plus the result list.
+
+        The request is sent on the first iteration. Non-table responses yield
+        their single result; with debug on, last_raw_bytes only covers the length prefix.
+        Closing the generator early discards the rest of the response so the
+        connection stays usable.
+        """
+        if mode == 'columnar':
+            raise ValueError("execute_stream() yields rows; use execute_batches() for column-major results")
+        return self._stream(fql, mode, 0)
+
+    def execute_batches(self, fql: str, size: int = 1024) -> Iterator[Union[str, Dict[str, Any]]]:
+        """Streams a binary table in column-major batches of up to size rows,
+        each shaped like a 'columnar' result ({column name: values}, numeric
+        columns packed into arrays). Every batch packs its columns on its own,
+        so a column can be an array in one batch and a list in the next.
+        """
+        if size < 1:
+            raise ValueError(f"batch size must be at least 1, got {size}")
+        return self._stream(fql, 'binary', size)
+
+    def _stream(self, fql: str, mode: str, batch: int):
+        if not self._conn.is_connected():
+            raise OperationalError("Database is not connected")
+
+        self.last_raw_bytes = b''
+        self._raw_parts = []
+        msg_type = MODE_COMMANDS.get(mode, CMD_TEXT)
+        packet = _build_frame(fql, msg_type)
+
+        try:
+            self._conn.sock.sendall(packet)
+            resp_len, = U32.unpack(self._recv_n(U32.size))
+            if msg_type != CMD_BINARY:
+                body_data = self._recv_n(resp_len)
+                self._publish_raw()
+                yield self._parse_text_body(body_data)
+                return
+        except socket.error as e:
+            self._conn._abort()
+            raise OperationalError(f"Network error: {e}")
+        finally:
+            self._publish_raw()
+
+        yield from self._stream_binary_body(resp_len, batch)
 
-        # 2. Pack & Send Request
-        payload_bytes = fql.encode('utf-8')
-        header = HEADER_STRUCT.pack(msg_type, len(payload_bytes))
+    def _stream_binary_body(self, resp_len: int, batch: int = 0) -> Iterator[Union[str, List, Dict]]:
+        """Incremental counterpart of _parse_binary_body, reading straight from
+        the socket: one row at a time, or column-major batches of batch rows."""
+        read = self._conn.rfile.read
+        left = resp_len
+
+        def take(n):
+            nonlocal left
+            data = read(n)
+            if len(data) < n:
+                self._conn._abort()
+                raise OperationalError("Connection closed by server")
+            left -= n
+            return data
 
         try:
-            self._conn.sock.sendall(header + payload_bytes)
+            # Only tables are worth streaming; messages and errors are small
+            resp_type = take(1)
+            if resp_type != b'\x02':
+                yield self._parse_binary_body(resp_type + take(left))
+                return
 
-            # [FIX] 3. Read Response LENGTH Header (4 Bytes)
-            # The server now sends the length first!
-            len_bytes = self._recv_n(4)
-            resp_len = struct.unpack('!I', len_bytes)[0]
+            num_cols, num_rows = U32_PAIR.unpack(take(U32_PAIR.size))
+            columns = []
+            converters = []
+            for _ in range(num_cols):
+                # type byte + name length: the same '!cI' layout as a request header
+                type_tag, name_len = HEADER_STRUCT.unpack(take(HEADER_STRUCT.size))
+                converters.append(COLUMN_CONVERTERS.get(type_tag[0], _auto_value))
+                columns.append(take(name_len).decode('utf-8'))
 
-            # 4. Read Response BODY
-            # We read exactly 'resp_len' bytes. This is the Payload.
-            body_data = self._recv_n(resp_len)
+            if batch:
+                _check_unique_columns(columns)
+                while num_rows:
+                    count = min(batch, num_rows)
+                    num_rows -= count
+                    values = [[] for _ in converters]
+                    cells = [(column.append, convert) for column, convert in zip(values, converters)]
+                    for _ in range(count):
+                        for append, convert in cells:
+                            val_len, = U32.unpack(take(U32.size))
+                            append(convert(take(val_len)))
+                    yield dict(zip(columns, map(_pack_column, values)))
+                return
 
-            # 5. Parse Payload
-            if mode == 'binary':
-                return self._parse_binary_body(body_data)
-            else:
-                return self._parse_text_body(body_data)
+            for _ in range(num_rows):
+                row_data = []
+                for convert in converters:
+                    val_len, = U32.unpack(take(U32.size))
+                    row_data.append(convert(take(val_len)))
+                yield row_data
 
+        except (QueryError, OperationalError):
+            raise
         except socket.error as e:
+            self._conn._abort()
             raise OperationalError(f"Network error: {e}")
+        except Exception as e:
+            raise OperationalError(f"Binary parse failed: {e}")
+        finally:
+            # Stopped early (or failed mid-body): drop the unread bytes so the next response lines up
+            while left > 0:
+                try:
+                    chunk = read(min(left, RECV_BUFFER))
+                except (OSError, ValueError):
+                    break
+                if not chunk:
+                    break
+                left -= len(chunk)
+
+    def _recv_response(self) -> bytes:
+        """Reads one response frame: a 4-byte length, then exactly that many payload bytes."""
+        resp_len, = U32.unpack(self._recv_n(U32.size))
+        return self._recv_n(resp_len)
+
+    def _parse_body(self, data: bytes, mode: str):
+        if mode == 'binary':
+            return self._parse_binary_body(data)
+        if mode == 'columnar':
+            return self._parse_binary_body(data, columnar=True)
+        return self._parse_text_body(data)
 
     def _parse_text_body(self, data: bytes) -> str:
         """Standard text/json reader."""
         try:
-            response = data.decode('utf-8').strip()
-            if "ERROR" in response and not response.startswith("{"):
+            # Strip the bytes before decoding: one copy of the body instead of two
+            response = data.strip().decode('utf-8')
+            # Text-mode failures always lead with "ERROR" (TextProtocol / SerializeError); JSON never does
+            if response.startswith("ERROR"):
                 raise QueryError(response)
             return response
         except UnicodeDecodeError:
             raise OperationalError("Received non-text data")
 
-    def _parse_binary_body(self, data: bytes):
+    def _parse_binary_body(self, data: bytes, columnar: bool = False):
         """
         Unpacks the Professional Binary Protocol from C++.
         Now works on the pre-fetched 'data' buffer.
+        With columnar=True a table comes back as {column name: values}, with
+        numeric columns packed into arrays instead of one list per row.
         """
         try:
-            # We need a stream-like object to read sequentially from 'data'
-            # Or just use slicing logic. Let's use slicing for clarity.
-            ptr = 0
-            
-            # 1. Read Response Type (1 Byte)
-            resp_type = data[ptr]
-            ptr += 1
-
-            # --- CASE: ERROR (0xFF) ---
-            if resp_type == 0xFF:
-                msg_len = struct.unpack('!I', data[ptr:ptr+4])[0]
-                ptr += 4
-                error_msg = data[ptr:ptr+msg_len].decode('utf-8')
-                raise QueryError(f"Server Error: {error_msg}")
-
-            # --- CASE: SIMPLE MESSAGE (0x01) ---
-            elif resp_type == 0x01:
-                msg_len = struct.unpack('!I', data[ptr:ptr+4])[0]
-                ptr += 4
-                return data[ptr:ptr+msg_len].decode('utf-8')
-
-            # --- CASE: TABLE DATA (0x02) ---
-            elif resp_type == 0x02:
-                # A. Read Metadata
-                num_cols = struct.unpack('!I', data[ptr:ptr+4])[0]
-                ptr += 4
-                num_rows = struct.unpack('!I', data[ptr:ptr+4])[0]
-                ptr += 4
-
-                # B. Read Columns
-                columns = []
-                for _ in range(num_cols):
-                    # col_type = data[ptr] # Unused in python currently
-                    ptr += 1 
-                    name_len = struct.unpack('!I', data[ptr:ptr+4])[0]
-                    ptr += 4
-                    col_name = data[ptr:ptr+name_len].decode('utf-8')
-                    ptr += name_len
-                    columns.append(col_name)
-
-                # C. Read Rows
-                result_rows = []
-                for _ in range(num_rows):
-                    row_data = []
-                    for _ in range(num_cols):
-                        val_len = struct.unpack('!I', data[ptr:ptr+4])[0]
-                        ptr += 4
-                        val_str = data[ptr:ptr+val_len].decode('utf-8')
-                        ptr += val_len
-
-                        # Auto-convert numbers
-                        if val_str.isdigit() or (val_str.startswith("-") and val_str[1:].isdigit()):
-                            row_data.append(int(val_str))
-                        else:
-                            # Try float
-                            try:
-                                row_data.append(float(val_str))
-                            except ValueError:
-                                row_data.append(val_str)
-
-                    result_rows.append(row_data)
-
-                return result_rows
+            # 1. Read Response Type (1 Byte), then hand the rest to its decoder
+            parse = _BINARY_DECODERS.get(data[0])
+            if parse is not None:
+                return parse(data, 1, columnar)
 
         except Exception as e:
             if isinstance(e, QueryError): raise e
@@ -166,16 +404,22 @@ class Cursor:
 # 4. CONNECTION CLASS
 # ==========================================
 class ChronosDB:
-    def __init__(self, host='localhost', port=2501, timeout=10):
+    def __init__(self, host='localhost', port=2501, timeout=10, recv_buffer=RECV_BUFFER):
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.recv_buffer = recv_buffer   # most bytes pulled per socket read
         self.sock = None
+        self.rfile = None
         self._connected = False
 
     def connect(self, username='', password='', database=''):
         try:
             self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            # Request/response round-trips: don't let Nagle hold back small packets like LOGIN
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self.rfile = self.sock.makefile('rb', buffering=self.recv_buffer)
             self._connected = True
             with self.cursor() as cur:
                 if username and password:
@@ -188,18 +432,282 @@ class ChronosDB:
             self._connected = False
             raise OperationalError(f"Connection error: {e}")
 
-    def cursor(self): return Cursor(self)
+    def cursor(self, debug=False): return Cursor(self, debug)
     def is_connected(self): return self._connected and self.sock is not None
-    def close(self):
+    def close(self): self._abort()
+    def _abort(self):
+        """Drops the socket; cursors call this when a reply may be half read
+        (a pooled connection is reopened on its next checkout)."""
+        if self.rfile:
+            try: self.rfile.close()
+            except: pass
         if self.sock:
             try: self.sock.close()
             except: pass
+        self.rfile = None
         self.sock = None
         self._connected = False
     def __enter__(self): return self
     def __exit__(self, exc_type, exc_val, exc_tb): self.close()
 
-def connect(host='localhost', port=2501, user='', password='', database=''):
-    conn = ChronosDB(host, port)
+def connect(host='localhost', port=2501, user='', password='', database='', pool=False, timeout=10,
+            recv_buffer=RECV_BUFFER):
+    """Open a logged-in connection.
+
+    timeout bounds every socket wait, connect included; a read that times out
+    raises OperationalError and drops the connection. recv_buffer is the
+    most bytes pulled per socket read. With pool=True the
+    connection is borrowed from a process-wide pool keyed on all the
+    arguments, and close() returns it there. Repeat connects skip the TCP
+    handshake and the LOGIN / 2ESTA5DEM round-trips.
+    """
+    if pool:
+        shared = _shared_pool(host, port, user, password, database, timeout, recv_buffer)
+        return PooledConnection(shared, shared.acquire())
+    conn = ChronosDB(host, port, timeout, recv_buffer)
     conn.connect(user, password, database)
-    return conn
\ No newline at end of file
+    return conn
+
+
+# ==========================================
+# 5. CONNECTION POOL
+# ==========================================
+def _is_live(conn: ChronosDB) -> bool:
+    """An idle connection should have nothing to read: the server never speaks
+    first, so a readable socket means it was closed (or left stray data)."""
+    if not conn.is_connected():
+        return False
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return False
+    return not readable
+
+class ConnectionPool:
+    """A bounded set of logged-in connections shared between threads.
+
+    Connecting and running LOGIN / 2ESTA5DEM once per connection, instead of
+    once per query, takes the TCP handshake and auth round-trips off every
+    request. With prefill=False connections are opened on demand, up to size.
+    """
+    def __init__(self, host='localhost', port=2501, user='', password='', database='', size=8, timeout=10,
+                 prefill=True, recv_buffer=RECV_BUFFER):
+        self._args = (host, port, user, password, database, timeout, recv_buffer)
+        self._size = size
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue(maxsize=size)   # LIFO keeps the warmest connections in use
+        if prefill:
+            for _ in range(size):
+                self._idle.put(self._open())
+            self._opened = size
+
+    def _open(self):
+        host, port, user, password, database, timeout, recv_buffer = self._args
+        conn = ChronosDB(host, port, timeout, recv_buffer)
+        conn.connect(user, password, database)
+        return conn
+
+    def acquire(self, timeout=5) -> ChronosDB:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._opened < self._size
+                if grow:
+                    self._opened += 1
+            if grow:
+                try:
+                    return self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                raise OperationalError("No pooled connection available")
+        if _is_live(conn):
+            return conn
+        conn.close()
+        try:
+            return self._open()   # replaces the dropped connection; the slot count is unchanged
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def release(self, conn: ChronosDB):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, timeout=5):
+        """Borrow a connection; one that failed at the network level is replaced before it goes back."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except OperationalError:
+            conn.close()
+            try:
+                conn = self._open()
+            except ChronosDBError:
+                pass   # returned closed; the next user's execute() reports it
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self):
+        while True:
+            try: self._idle.get_nowait().close()
+            except queue.Empty: break
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc_val, exc_tb): self.close()
+
+class PooledConnection:
+    """One checkout from a connect(pool=True) pool, used like a ChronosDB.
+
+    close() hands the connection back exactly once. After that this handle
+    and its cursors report disconnected, so closing twice, or closing a stale
+    handle, can never release or drop a connection someone else now holds.
+    """
+    def __init__(self, pool: ConnectionPool, conn: ChronosDB):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):   # sock, rfile, host, ... of the borrowed connection
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise OperationalError("Connection has been returned to the pool")
+        return getattr(conn, name)
+
+    def cursor(self, debug=False): return Cursor(self, debug)
+    def is_connected(self): return self._conn is not None and self._conn.is_connected()
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc_val, exc_tb): self.close()
+
+# Process-wide pools behind connect(pool=True), keyed on the connection arguments
+SHARED_POOL_SIZE = 8
+_shared_pools: Dict[tuple, ConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
+
+def _shared_pool(host, port, user, password, database, timeout, recv_buffer) -> ConnectionPool:
+    key = (host, port, user, password, database, timeout, recv_buffer)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = ConnectionPool(host, port, user, password, database,
+                                                       size=SHARED_POOL_SIZE, timeout=timeout, prefill=False,
+                                                       recv_buffer=recv_buffer)
+        return pool
+
+
+# ==========================================
+# 6. ASYNC CLIENT
+# ==========================================
+class AsyncCursor:
+    """asyncio counterpart of Cursor; responses go through the same parsers.
+
+    A connection runs one statement at a time, so concurrent tasks overlap
+    their round-trips by each using their own AsyncChronosDB.
+    """
+    _parse_body = Cursor._parse_body
+    _parse_text_body = Cursor._parse_text_body
+    _parse_binary_body = Cursor._parse_binary_body
+
+    def __init__(self, connection, debug=False):
+        self._conn = connection
+        self.debug = debug
+        self.last_raw_bytes = b''
+
+    async def _exchange(self, packet: bytes) -> bytes:
+        reader, writer = self._conn._reader, self._conn._writer
+        writer.write(packet)
+        await writer.drain()
+        head = await reader.readexactly(U32.size)
+        resp_len, = U32.unpack(head)
+        body = await reader.readexactly(resp_len)
+        if self.debug:
+            self.last_raw_bytes = head + body
+        return body
+
+    async def execute(self, fql: str, mode: str = 'text') -> Union[str, List, Dict]:
+        conn = self._conn
+        if not conn.is_connected():
+            raise OperationalError("Database is not connected")
+
+        self.last_raw_bytes = b''
+        packet = _build_frame(fql, MODE_COMMANDS.get(mode, CMD_TEXT))
+
+        # A reply left half-read would desync the stream, so any failure drops the connection
+        async with conn._lock:
+            try:
+                body_data = await asyncio.wait_for(self._exchange(packet), conn.timeout)
+            except asyncio.IncompleteReadError:
+                conn._abort()
+                raise OperationalError("Connection closed by server")
+            except asyncio.TimeoutError:
+                conn._abort()
+                raise OperationalError("Timed out waiting for the server")
+            except OSError as e:
+                conn._abort()
+                raise OperationalError(f"Network error: {e}")
+            except asyncio.CancelledError:
+                conn._abort()
+                raise
+
+        return self._parse_body(body_data, mode)
+
+    async def close(self): pass
+    async def __aenter__(self): return self
+    async def __aexit__(self, exc_type, exc_val, exc_tb): await self.close()
+
+class AsyncChronosDB:
+    def __init__(self, host='localhost', port=2501, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+        self._connected = False
+
+    async def connect(self, username='', password='', database=''):
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, limit=RECV_BUFFER), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise OperationalError(f"Connection error: {e}")
+        self._connected = True   # asyncio already sets TCP_NODELAY on TCP transports
+        cur = self.cursor()
+        if username and password:
+            res = await cur.execute(f"LOGIN {username} {password};")
+            if "OK" not in str(res) and "SUCCESS" not in str(res):
+                raise AuthError(f"Login failed: {res}")
+        if database:
+            await cur.execute(f"2ESTA5DEM {database};")
+
+    def cursor(self, debug=False): return AsyncCursor(self, debug)
+    def is_connected(self): return self._connected and self._writer is not None
+    def _abort(self):
+        if self._writer:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+        self._connected = False
+    async def close(self):
+        writer = self._writer
+        self._abort()
+        if writer:
+            try: await writer.wait_closed()
+            except OSError: pass
+    async def __aenter__(self): return self
+    async def __aexit__(self, exc_type, exc_val, exc_tb): await self.close()
+
+async def connect_async(host='localhost', port=2501, user='', password='', database='') -> AsyncChronosDB:
+    conn = AsyncChronosDB(host, port)
+    await conn.connect(user, password, database)
+    return conn